@@ -1,34 +1,52 @@
 from __future__ import annotations
 
 import re
+import secrets
 import time
-import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from pathlib import Path
 
 import httpx
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, Response
-from pydantic import BaseModel, Field
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
 
-from app.paper_lookup import USER_AGENT, discover_paper
+from app.paper_lookup import create_http_client, discover_paper
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 STATIC_DIR = BASE_DIR / "static"
 DOWNLOAD_TTL_SECONDS = 30 * 60
+DOWNLOAD_CACHE_MAX_ENTRIES = 10_000
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
+_SANITIZE_RE = re.compile(r"[^a-zA-Z0-9._-]+")
+_CD_RE = re.compile(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?')
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class DownloadEntry:
     url: str
     filename: str
     created_at: float
 
 
-DOWNLOAD_CACHE: dict[str, DownloadEntry] = {}
+DOWNLOAD_CACHE: OrderedDict[str, DownloadEntry] = OrderedDict()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    app.state.http = create_http_client()
+    try:
+        yield
+    finally:
+        await app.state.http.aclose()
 
-app = FastAPI(title="Biotech Paper Puller", version="0.1.0")
+
+app = FastAPI(title="Biotech Paper Puller", version="0.1.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -39,12 +57,14 @@ app.add_middleware(
 
 
 class LookupRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid", str_strip_whitespace=True)
+
     title: str = Field(min_length=5, max_length=500)
     first_author_last_name: str = Field(min_length=2, max_length=100)
 
 
 def _sanitize_filename(raw_title: str) -> str:
-    cleaned = re.sub(r"[^a-zA-Z0-9._-]+", "_", raw_title).strip("_")
+    cleaned = _SANITIZE_RE.sub("_", raw_title).strip("_")
     if not cleaned:
         cleaned = "paper"
     if not cleaned.lower().endswith(".pdf"):
@@ -55,7 +75,7 @@ def _sanitize_filename(raw_title: str) -> str:
 def _filename_from_content_disposition(content_disposition: str | None) -> str | None:
     if not content_disposition:
         return None
-    match = re.search(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', content_disposition)
+    match = _CD_RE.search(content_disposition)
     if not match:
         return None
     filename = match.group(1).strip()
@@ -65,23 +85,46 @@ def _filename_from_content_disposition(content_disposition: str | None) -> str |
 
 
 def _prune_download_cache() -> None:
+    # Entries are inserted in creation order, so expired tokens are always at the front.
     now = time.time()
-    expired_tokens = [
-        token for token, entry in DOWNLOAD_CACHE.items() if now - entry.created_at > DOWNLOAD_TTL_SECONDS
-    ]
-    for token in expired_tokens:
-        DOWNLOAD_CACHE.pop(token, None)
+    while DOWNLOAD_CACHE:
+        oldest = next(iter(DOWNLOAD_CACHE.values()))
+        if now - oldest.created_at <= DOWNLOAD_TTL_SECONDS:
+            break
+        DOWNLOAD_CACHE.popitem(last=False)
 
 
 def _register_download(url: str, title: str) -> str:
     _prune_download_cache()
-    token = uuid.uuid4().hex
+    token = secrets.token_hex(16)
     DOWNLOAD_CACHE[token] = DownloadEntry(
         url=url, filename=_sanitize_filename(title or "paper"), created_at=time.time()
     )
+    while len(DOWNLOAD_CACHE) > DOWNLOAD_CACHE_MAX_ENTRIES:
+        DOWNLOAD_CACHE.popitem(last=False)
     return token
 
 
+def _download_headers(response: httpx.Response, filename: str) -> dict[str, str]:
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    # aiter_bytes() decodes the body, so the upstream length only holds for unencoded responses.
+    content_length = response.headers.get("content-length")
+    if content_length and response.headers.get("content-encoding", "identity") == "identity":
+        headers["Content-Length"] = content_length
+    etag = response.headers.get("etag")
+    if etag:
+        headers["ETag"] = etag
+    return headers
+
+
+async def _stream_upstream(response: httpx.Response) -> AsyncIterator[bytes]:
+    try:
+        async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+            yield chunk
+    finally:
+        await response.aclose()
+
+
 @app.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
@@ -93,10 +136,11 @@ async def home() -> FileResponse:
 
 
 @app.post("/api/lookup")
-async def lookup(request: LookupRequest) -> dict:
+async def lookup(request: LookupRequest, http_request: Request) -> dict:
     result = await discover_paper(
-        requested_title=request.title.strip(),
-        requested_first_author_last_name=request.first_author_last_name.strip(),
+        http_request.app.state.http,
+        requested_title=request.title,
+        requested_first_author_last_name=request.first_author_last_name,
     )
     match = result.get("match")
     candidate_urls = result.get("candidate_urls", [])
@@ -122,7 +166,7 @@ async def lookup(request: LookupRequest) -> dict:
 
 
 @app.get("/api/download/{token}")
-async def download(token: str) -> Response:
+async def download(token: str, http_request: Request) -> StreamingResponse:
     _prune_download_cache()
     entry = DOWNLOAD_CACHE.get(token)
     if not entry:
@@ -131,20 +175,22 @@ async def download(token: str) -> Response:
             detail="Download token not found or expired. Run lookup again to create a fresh token.",
         )
 
+    client: httpx.AsyncClient = http_request.app.state.http
     timeout = httpx.Timeout(120.0, connect=20.0)
     try:
-        async with httpx.AsyncClient(
-            headers={"User-Agent": USER_AGENT}, follow_redirects=True, timeout=timeout
-        ) as client:
-            response = await client.get(entry.url)
-            response.raise_for_status()
+        response = await client.send(client.build_request("GET", entry.url, timeout=timeout), stream=True)
+    except httpx.HTTPError as exc:
+        raise HTTPException(status_code=502, detail=f"Failed to fetch upstream full text: {exc}") from exc
+    try:
+        response.raise_for_status()
     except httpx.HTTPError as exc:
+        await response.aclose()
         raise HTTPException(status_code=502, detail=f"Failed to fetch upstream full text: {exc}") from exc
 
     media_type = response.headers.get("content-type", "application/octet-stream").split(";")[0].strip()
     filename = _filename_from_content_disposition(response.headers.get("content-disposition")) or entry.filename
-    return Response(
-        content=response.content,
+    return StreamingResponse(
+        _stream_upstream(response),
         media_type=media_type or "application/octet-stream",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        headers=_download_headers(response, filename),
     )
@@ -1,32 +1,55 @@
 from __future__ import annotations
 
+import asyncio
+import copy
 import os
 import re
-from difflib import SequenceMatcher
-from typing import Any
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, NamedTuple, TypeVar
 from urllib.parse import urlparse
 
 import httpx
+import orjson
+from rapidfuzz import fuzz, process
 
 CROSSREF_WORKS_URL = "https://api.crossref.org/works"
 EUROPE_PMC_SEARCH_URL = "https://www.ebi.ac.uk/europepmc/webservices/rest/search"
 UNPAYWALL_URL_TEMPLATE = "https://api.unpaywall.org/v2/{doi}"
 USER_AGENT = "Biotech-Paper-Puller/0.1"
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0)
+HTTP_TIMEOUT = httpx.Timeout(20.0, connect=10.0)
+CONFIDENT_TITLE_SCORE = 0.95
+PROVIDER_DEADLINE_SECONDS = 15.0
+LOOKUP_CACHE_TTL_SECONDS = 5 * 60
+LOOKUP_CACHE_MAX_ENTRIES = 1024
+
+T = TypeVar("T")
+
+_RE_NON_ALNUM = re.compile(r"[^a-z0-9\s]")
+_RE_WS = re.compile(r"\s+")
+
+_LOOKUP_CACHE: OrderedDict[tuple[str, str, str], tuple[float, dict[str, Any]]] = OrderedDict()
 
 
 def normalize_text(value: str) -> str:
-    normalized = re.sub(r"[^a-z0-9\s]", " ", (value or "").lower())
-    return re.sub(r"\s+", " ", normalized).strip()
+    normalized = _RE_NON_ALNUM.sub(" ", (value or "").lower())
+    return _RE_WS.sub(" ", normalized).strip()
 
 
 def normalize_last_name(value: str) -> str:
     return normalize_text(value).replace(" ", "")
 
 
-def title_similarity(left: str, right: str) -> float:
-    if not left or not right:
-        return 0.0
-    return SequenceMatcher(None, normalize_text(left), normalize_text(right)).ratio()
+def _batch_title_similarity(requested_title_norm: str, candidate_title_norms: list[str]) -> list[float]:
+    scores = [0.0] * len(candidate_title_norms)
+    if not requested_title_norm or not candidate_title_norms:
+        return scores
+    for _, score, index in process.extract(
+        requested_title_norm, candidate_title_norms, scorer=fuzz.ratio, limit=None
+    ):
+        scores[index] = score / 100.0
+    return scores
 
 
 def extract_crossref_pdf_links(item: dict[str, Any]) -> list[str]:
@@ -77,28 +100,55 @@ def _format_crossref_authors(item: dict[str, Any]) -> tuple[list[str], str | Non
     return formatted_authors, first_author_last_name
 
 
-def _score_crossref_item(
-    item: dict[str, Any], requested_title: str, requested_first_author_last_name: str
-) -> float:
+def _crossref_title(item: dict[str, Any]) -> str:
     titles = item.get("title") or []
-    candidate_title = titles[0] if titles else ""
-    score = title_similarity(candidate_title, requested_title)
+    return titles[0] if titles else ""
 
-    target_last_name = normalize_last_name(requested_first_author_last_name)
+
+class _CrossrefCandidate(NamedTuple):
+    item: dict[str, Any]
+    title_norm: str
+    has_authors: bool
+    first_family: str
+    families: frozenset[str]
+
+
+def _prepare_crossref(items: list[dict[str, Any]]) -> list[_CrossrefCandidate]:
+    candidates: list[_CrossrefCandidate] = []
+    for item in items:
+        authors = item.get("author") or []
+        families = [normalize_last_name((author or {}).get("family", "")) for author in authors]
+        candidates.append(
+            _CrossrefCandidate(
+                item=item,
+                title_norm=normalize_text(_crossref_title(item)),
+                has_authors=bool(authors),
+                first_family=families[0] if families else "",
+                families=frozenset(families),
+            )
+        )
+    return candidates
+
+
+def _crossref_first_author_matches(candidate: _CrossrefCandidate, target_last_name: str) -> bool:
+    return bool(target_last_name) and candidate.first_family == target_last_name
+
+
+def _score_crossref_item(
+    candidate: _CrossrefCandidate, title_score: float, target_last_name: str
+) -> float:
+    score = title_score
     if not target_last_name:
         return score
 
-    authors = item.get("author") or []
-    if not authors:
+    if not candidate.has_authors:
         return score - 0.05
 
-    first_author_last_name = normalize_last_name((authors[0] or {}).get("family", ""))
-    if first_author_last_name and first_author_last_name == target_last_name:
+    if _crossref_first_author_matches(candidate, target_last_name):
         return score + 0.30
 
-    for author in authors:
-        if normalize_last_name((author or {}).get("family", "")) == target_last_name:
-            return score + 0.10
+    if target_last_name in candidate.families:
+        return score + 0.10
     return score
 
 
@@ -107,32 +157,51 @@ def pick_best_crossref_item(
 ) -> tuple[dict[str, Any] | None, float]:
     best_item: dict[str, Any] | None = None
     best_score = -1.0
+    requested_title_norm = normalize_text(requested_title)
+    target_last_name = normalize_last_name(requested_first_author_last_name)
+    candidates = _prepare_crossref(items)
+
+    # A verbatim title with the right first author already has the highest possible score.
+    if requested_title_norm:
+        for candidate in candidates:
+            if candidate.title_norm == requested_title_norm and (
+                not target_last_name or _crossref_first_author_matches(candidate, target_last_name)
+            ):
+                return candidate.item, _score_crossref_item(candidate, 1.0, target_last_name)
+
+    title_scores = _batch_title_similarity(
+        requested_title_norm, [candidate.title_norm for candidate in candidates]
+    )
 
-    for item in items:
-        score = _score_crossref_item(item, requested_title, requested_first_author_last_name)
+    for candidate, title_score in zip(candidates, title_scores):
+        score = _score_crossref_item(candidate, title_score, target_last_name)
         if score > best_score:
-            best_item = item
+            best_item = candidate.item
             best_score = score
+            if title_score >= CONFIDENT_TITLE_SCORE and _crossref_first_author_matches(
+                candidate, target_last_name
+            ):
+                break
 
     if best_score < 0.45:
         return None, 0.0
     return best_item, best_score
 
 
-def _score_europe_pmc_result(
-    result: dict[str, Any], requested_title: str, requested_first_author_last_name: str
-) -> float:
-    score = title_similarity(result.get("title", ""), requested_title)
-    target_last_name = normalize_last_name(requested_first_author_last_name)
+def _europe_pmc_first_author_matches(result: dict[str, Any], target_last_name: str) -> bool:
     if not target_last_name:
-        return score
-
+        return False
     first_author_raw = str(result.get("firstAuthor", "")).strip()
     first_author_last_name = first_author_raw.split(" ")[0]
-    first_author = normalize_last_name(first_author_last_name)
-    if first_author and first_author == target_last_name:
-        return score + 0.30
-    return score
+    return normalize_last_name(first_author_last_name) == target_last_name
+
+
+def _score_europe_pmc_result(
+    result: dict[str, Any], title_score: float, target_last_name: str
+) -> float:
+    if _europe_pmc_first_author_matches(result, target_last_name):
+        return title_score + 0.30
+    return title_score
 
 
 def pick_best_europe_pmc_result(
@@ -140,35 +209,61 @@ def pick_best_europe_pmc_result(
 ) -> tuple[dict[str, Any] | None, float]:
     best_result: dict[str, Any] | None = None
     best_score = -1.0
+    requested_title_norm = normalize_text(requested_title)
+    target_last_name = normalize_last_name(requested_first_author_last_name)
+    title_norms = [normalize_text(str(result.get("title") or "")) for result in results]
 
-    for result in results:
-        score = _score_europe_pmc_result(result, requested_title, requested_first_author_last_name)
+    if requested_title_norm:
+        for result, title_norm in zip(results, title_norms):
+            if title_norm == requested_title_norm and (
+                not target_last_name or _europe_pmc_first_author_matches(result, target_last_name)
+            ):
+                return result, _score_europe_pmc_result(result, 1.0, target_last_name)
+
+    title_scores = _batch_title_similarity(requested_title_norm, title_norms)
+
+    for result, title_score in zip(results, title_scores):
+        score = _score_europe_pmc_result(result, title_score, target_last_name)
         if score > best_score:
             best_result = result
             best_score = score
+            if title_score >= CONFIDENT_TITLE_SCORE and _europe_pmc_first_author_matches(
+                result, target_last_name
+            ):
+                break
 
     if best_score < 0.45:
         return None, 0.0
     return best_result, best_score
 
 
+def _clean_http_url(url: str) -> str | None:
+    if url.startswith(("http://", "https://")):
+        return url if urlparse(url).netloc else None
+    # Slow path for mixed-case schemes; geturl() lowercases the scheme like before.
+    parsed = urlparse(url)
+    if parsed.scheme not in {"http", "https"} or not parsed.netloc:
+        return None
+    return parsed.geturl()
+
+
 def dedupe_urls(urls: list[str]) -> list[str]:
     deduped: list[str] = []
     seen: set[str] = set()
+    kept: set[str] = set()
     for url in urls:
-        parsed = urlparse(url)
-        if parsed.scheme not in {"http", "https"} or not parsed.netloc:
+        if url in seen:
             continue
-        cleaned = parsed.geturl()
-        if cleaned not in seen:
-            seen.add(cleaned)
+        seen.add(url)
+        cleaned = _clean_http_url(url)
+        if cleaned and cleaned not in kept:
+            kept.add(cleaned)
             deduped.append(cleaned)
     return deduped
 
 
 def _build_crossref_match(item: dict[str, Any], score: float) -> dict[str, Any]:
-    title_candidates = item.get("title") or []
-    title = title_candidates[0] if title_candidates else ""
+    title = _crossref_title(item)
     authors, first_author_last_name = _format_crossref_authors(item)
     return {
         "source": "crossref",
@@ -204,13 +299,17 @@ async def fetch_crossref_match(
     try:
         response = await client.get(
             CROSSREF_WORKS_URL,
-            params={"query.title": requested_title, "rows": 15},
+            params={
+                "query.title": requested_title,
+                "rows": 5,
+                "select": "DOI,title,author,issued,publisher,link",
+            },
         )
         response.raise_for_status()
     except httpx.HTTPError:
         return None
 
-    items = ((response.json() or {}).get("message") or {}).get("items") or []
+    items = ((orjson.loads(response.content) or {}).get("message") or {}).get("items") or []
     best_item, score = pick_best_crossref_item(
         items, requested_title, requested_first_author_last_name
     )
@@ -226,13 +325,13 @@ async def fetch_europe_pmc_match(
     try:
         response = await client.get(
             EUROPE_PMC_SEARCH_URL,
-            params={"query": query, "format": "json", "pageSize": 15},
+            params={"query": query, "format": "json", "pageSize": 5},
         )
         response.raise_for_status()
     except httpx.HTTPError:
         return None
 
-    results = (((response.json() or {}).get("resultList") or {}).get("result") or [])
+    results = (((orjson.loads(response.content) or {}).get("resultList") or {}).get("result") or [])
     best_result, score = pick_best_europe_pmc_result(
         results, requested_title, requested_first_author_last_name
     )
@@ -258,7 +357,7 @@ async def fetch_unpaywall_pdf_url(
     except httpx.HTTPError:
         return None
 
-    payload = response.json() or {}
+    payload = orjson.loads(response.content) or {}
     best_location = payload.get("best_oa_location") or {}
     direct = best_location.get("url_for_pdf") or best_location.get("url")
     if direct:
@@ -271,6 +370,16 @@ async def fetch_unpaywall_pdf_url(
     return None
 
 
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        headers={"User-Agent": USER_AGENT},
+        http2=True,
+        follow_redirects=True,
+        timeout=HTTP_TIMEOUT,
+        limits=HTTP_LIMITS,
+    )
+
+
 def _pick_primary_match(
     crossref_match: dict[str, Any] | None, europe_pmc_match: dict[str, Any] | None
 ) -> dict[str, Any] | None:
@@ -281,21 +390,80 @@ def _pick_primary_match(
     return crossref_match or europe_pmc_match
 
 
-async def discover_paper(
-    requested_title: str, requested_first_author_last_name: str
+def _get_cached_lookup(key: tuple[str, str, str]) -> dict[str, Any] | None:
+    cached = _LOOKUP_CACHE.get(key)
+    if not cached:
+        return None
+    created_at, result = cached
+    if time.monotonic() - created_at > LOOKUP_CACHE_TTL_SECONDS:
+        _LOOKUP_CACHE.pop(key, None)
+        return None
+    _LOOKUP_CACHE.move_to_end(key)
+    return copy.deepcopy(result)
+
+
+def _store_cached_lookup(key: tuple[str, str, str], result: dict[str, Any]) -> None:
+    _LOOKUP_CACHE[key] = (time.monotonic(), copy.deepcopy(result))
+    _LOOKUP_CACHE.move_to_end(key)
+    while len(_LOOKUP_CACHE) > LOOKUP_CACHE_MAX_ENTRIES:
+        _LOOKUP_CACHE.popitem(last=False)
+
+
+async def _with_deadline(awaitable: Awaitable[T]) -> T | None:
+    try:
+        return await asyncio.wait_for(awaitable, PROVIDER_DEADLINE_SECONDS)
+    except asyncio.TimeoutError:
+        return None
+
+
+def _task_result(task: asyncio.Task[T | None]) -> T | None:
+    exc = task.exception()
+    if isinstance(exc, Exception):
+        return None
+    if exc is not None:
+        raise exc
+    return task.result()
+
+
+async def _discover_paper_uncached(
+    client: httpx.AsyncClient,
+    requested_title: str,
+    requested_first_author_last_name: str,
+    unpaywall_email: str,
 ) -> dict[str, Any]:
-    headers = {"User-Agent": USER_AGENT}
-    timeout = httpx.Timeout(20.0, connect=10.0)
-    unpaywall_email = os.getenv("UNPAYWALL_EMAIL", "").strip()
+    provider_tasks = {
+        asyncio.create_task(
+            _with_deadline(
+                fetch_crossref_match(client, requested_title, requested_first_author_last_name)
+            )
+        ): "crossref",
+        asyncio.create_task(
+            _with_deadline(
+                fetch_europe_pmc_match(client, requested_title, requested_first_author_last_name)
+            )
+        ): "europe_pmc",
+    }
+    matches: dict[str, dict[str, Any] | None] = {}
+    unpaywall_tasks: dict[str, asyncio.Task[str | None]] = {}
 
-    async with httpx.AsyncClient(headers=headers, follow_redirects=True, timeout=timeout) as client:
-        crossref_match = await fetch_crossref_match(
-            client, requested_title, requested_first_author_last_name
-        )
-        europe_pmc_match = await fetch_europe_pmc_match(
-            client, requested_title, requested_first_author_last_name
-        )
+    def start_unpaywall(doi: str | None) -> None:
+        if doi and unpaywall_email and doi not in unpaywall_tasks:
+            unpaywall_tasks[doi] = asyncio.create_task(
+                _with_deadline(fetch_unpaywall_pdf_url(client, doi, unpaywall_email))
+            )
 
+    try:
+        # Start Unpaywall as soon as either provider yields a DOI instead of waiting for both.
+        pending: set[asyncio.Task[dict[str, Any] | None]] = set(provider_tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                match = _task_result(task)
+                matches[provider_tasks[task]] = match
+                start_unpaywall((match or {}).get("doi"))
+
+        crossref_match = matches.get("crossref")
+        europe_pmc_match = matches.get("europe_pmc")
         primary_match = _pick_primary_match(crossref_match, europe_pmc_match)
         doi = (primary_match or {}).get("doi") or (crossref_match or {}).get("doi")
 
@@ -305,20 +473,52 @@ async def discover_paper(
         if crossref_match:
             candidate_urls.extend(crossref_match.get("pdf_links", []))
         if doi and unpaywall_email:
-            unpaywall_url = await fetch_unpaywall_pdf_url(client, doi, unpaywall_email)
+            start_unpaywall(doi)
+            unpaywall_task = unpaywall_tasks[doi]
+            await asyncio.wait({unpaywall_task})
+            unpaywall_url = _task_result(unpaywall_task)
             if unpaywall_url:
                 candidate_urls.append(unpaywall_url)
+    finally:
+        for task in [*provider_tasks, *unpaywall_tasks.values()]:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # Retrieve exceptions from unused Unpaywall tasks so asyncio doesn't log them.
+                task.exception()
+
+    warnings: list[str] = []
+    if doi and not unpaywall_email:
+        warnings.append(
+            "UNPAYWALL_EMAIL is not set. Add it to increase legal full-text coverage."
+        )
+
+    return {
+        "match": primary_match,
+        "candidate_urls": dedupe_urls(candidate_urls),
+        "warnings": warnings,
+        "crossref_match": crossref_match,
+        "europe_pmc_match": europe_pmc_match,
+    }
 
-        warnings: list[str] = []
-        if doi and not unpaywall_email:
-            warnings.append(
-                "UNPAYWALL_EMAIL is not set. Add it to increase legal full-text coverage."
-            )
 
-        return {
-            "match": primary_match,
-            "candidate_urls": dedupe_urls(candidate_urls),
-            "warnings": warnings,
-            "crossref_match": crossref_match,
-            "europe_pmc_match": europe_pmc_match,
-        }
+async def discover_paper(
+    client: httpx.AsyncClient, requested_title: str, requested_first_author_last_name: str
+) -> dict[str, Any]:
+    unpaywall_email = os.getenv("UNPAYWALL_EMAIL", "").strip()
+    cache_key = (
+        normalize_text(requested_title),
+        normalize_last_name(requested_first_author_last_name),
+        unpaywall_email,
+    )
+    cached = _get_cached_lookup(cache_key)
+    if cached is not None:
+        return cached
+
+    result = await _discover_paper_uncached(
+        client, requested_title, requested_first_author_last_name, unpaywall_email
+    )
+    # Only cache hits; an empty result may just be a transient provider failure.
+    if result["match"]:
+        _store_cached_lookup(cache_key, result)
+    return result
@@ -0,0 +1,125 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app import main
+from app.main import DOWNLOAD_CACHE, _prune_download_cache, _register_download
+
+
+def test_prune_download_cache_drops_only_expired_tokens(monkeypatch) -> None:
+    DOWNLOAD_CACHE.clear()
+    monkeypatch.setattr(main.time, "time", lambda: 1_000.0)
+    stale = _register_download("https://example.org/old.pdf", "Old paper")
+    monkeypatch.setattr(main.time, "time", lambda: 1_000.0 + main.DOWNLOAD_TTL_SECONDS)
+    fresh = _register_download("https://example.org/new.pdf", "New paper")
+
+    monkeypatch.setattr(main.time, "time", lambda: 1_001.0 + main.DOWNLOAD_TTL_SECONDS)
+    _prune_download_cache()
+
+    assert stale not in DOWNLOAD_CACHE
+    assert fresh in DOWNLOAD_CACHE
+
+
+def test_register_download_evicts_oldest_beyond_max_entries(monkeypatch) -> None:
+    DOWNLOAD_CACHE.clear()
+    monkeypatch.setattr(main, "DOWNLOAD_CACHE_MAX_ENTRIES", 2)
+    tokens = [_register_download(f"https://example.org/{i}.pdf", "Paper") for i in range(3)]
+
+    assert list(DOWNLOAD_CACHE) == tokens[1:]
+
+
+def test_filename_from_content_disposition_sanitizes_upstream_name() -> None:
+    assert (
+        main._filename_from_content_disposition('attachment; filename="CRISPR review.pdf"')
+        == "CRISPR_review.pdf"
+    )
+    assert main._filename_from_content_disposition("inline") is None
+
+
+def test_lookup_request_strips_whitespace_and_rejects_extra_fields() -> None:
+    request = main.LookupRequest(title="  CRISPR screens  ", first_author_last_name=" Miller ")
+    assert request.title == "CRISPR screens"
+    assert request.first_author_last_name == "Miller"
+
+    with pytest.raises(ValidationError):
+        main.LookupRequest(title="CRISPR screens", first_author_last_name="Miller", year=2020)
+
+
+def test_download_headers_forward_length_only_for_unencoded_bodies() -> None:
+    plain = httpx.Response(200, headers={"content-length": "2048", "etag": '"abc"'})
+    assert main._download_headers(plain, "paper.pdf") == {
+        "Content-Disposition": 'attachment; filename="paper.pdf"',
+        "Content-Length": "2048",
+        "ETag": '"abc"',
+    }
+
+    gzipped = httpx.Response(200, headers={"content-length": "512", "content-encoding": "gzip"})
+    assert "Content-Length" not in main._download_headers(gzipped, "paper.pdf")
+
+
+class _TrackingStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: list[bytes]) -> None:
+        self.chunks = chunks
+        self.closed = False
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def _download_client(monkeypatch, handler) -> TestClient:
+    monkeypatch.setattr(
+        main, "create_http_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    return TestClient(main.app)
+
+
+def test_download_streams_upstream_body_and_closes_it(monkeypatch) -> None:
+    stream = _TrackingStream([b"%PDF-1.7 ", b"body"])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"content-type": "application/pdf"}, stream=stream)
+
+    with _download_client(monkeypatch, handler) as client:
+        token = _register_download("https://example.org/paper.pdf", "CRISPR review")
+        response = client.get(f"/api/download/{token}")
+
+    assert response.status_code == 200
+    assert response.content == b"%PDF-1.7 body"
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["content-disposition"] == 'attachment; filename="CRISPR_review.pdf"'
+    assert stream.closed
+
+
+def test_download_returns_502_and_closes_stream_on_upstream_error(monkeypatch) -> None:
+    stream = _TrackingStream([b"not found"])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(404, stream=stream)
+
+    with _download_client(monkeypatch, handler) as client:
+        token = _register_download("https://example.org/missing.pdf", "Missing paper")
+        response = client.get(f"/api/download/{token}")
+
+    assert response.status_code == 502
+    assert stream.closed
+
+
+def test_stream_upstream_closes_response_when_abandoned_mid_body() -> None:
+    first_chunk = b"a" * main.DOWNLOAD_CHUNK_SIZE
+    stream = _TrackingStream([first_chunk, b"b" * main.DOWNLOAD_CHUNK_SIZE])
+
+    async def run() -> bytes:
+        body = main._stream_upstream(httpx.Response(200, stream=stream))
+        first = await body.__anext__()
+        await body.aclose()
+        return first
+
+    assert asyncio.run(run()) == first_chunk
+    assert stream.closed
@@ -1,9 +1,20 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app import paper_lookup
 from app.paper_lookup import (
+    CONFIDENT_TITLE_SCORE,
+    CROSSREF_WORKS_URL,
+    EUROPE_PMC_SEARCH_URL,
     dedupe_urls,
+    discover_paper,
     extract_crossref_pdf_links,
     extract_europe_pmc_pdf_url,
     normalize_text,
     pick_best_crossref_item,
+    pick_best_europe_pmc_result,
 )
 
 
@@ -36,6 +47,119 @@ def test_pick_best_crossref_item_uses_title_and_author() -> None:
     assert score > 0.8
 
 
+def test_pick_best_europe_pmc_result_prefers_first_author_match() -> None:
+    results = [
+        {"title": "Editing CAR-T cells with CRISPR-Cas9", "firstAuthor": "Jones A", "pmid": "1"},
+        {"title": "Editing CAR-T cells with CRISPR-Cas9", "firstAuthor": "Miller B", "pmid": "2"},
+        {"title": "Unrelated immunology review", "firstAuthor": "Miller B", "pmid": "3"},
+    ]
+
+    best_result, score = pick_best_europe_pmc_result(
+        results=results,
+        requested_title="Editing CAR-T cells with CRISPR Cas9",
+        requested_first_author_last_name="Miller",
+    )
+
+    assert best_result is not None
+    assert best_result.get("pmid") == "2"
+    assert score > 1.0
+
+
+def test_pick_best_crossref_item_rewards_co_author_match() -> None:
+    title = "Base editing restores dystrophin expression in vivo"
+    items = [
+        {"title": [title], "author": [{"family": "Chen"}, {"family": "Patel"}], "DOI": "10.1000/a"},
+        {"title": [title], "author": [{"family": "Chen"}, {"family": "Miller"}], "DOI": "10.1000/b"},
+        {"title": [title], "DOI": "10.1000/c"},
+    ]
+
+    best_item, score = pick_best_crossref_item(items, title, "Miller")
+
+    assert best_item is not None
+    assert best_item.get("DOI") == "10.1000/b"
+    assert score == 1.1
+
+
+def test_pick_best_crossref_item_exact_title_skips_fuzzy_scoring(monkeypatch) -> None:
+    def fail(*args, **kwargs):
+        raise AssertionError("fuzzy scoring should not run for an exact title match")
+
+    monkeypatch.setattr(paper_lookup, "_batch_title_similarity", fail)
+    items = [
+        {"title": ["CRISPR screens in T cells"], "author": [{"family": "Jones"}], "DOI": "10.1000/a"},
+        {"title": ["CRISPR Screens in T-Cells"], "author": [{"family": "Miller"}], "DOI": "10.1000/b"},
+    ]
+
+    best_item, score = pick_best_crossref_item(items, "CRISPR screens in T cells", "Miller")
+
+    assert best_item is not None
+    assert best_item.get("DOI") == "10.1000/b"
+    assert score == 1.3
+
+
+@pytest.mark.parametrize(
+    ("first_title_score", "expected_doi"),
+    [(CONFIDENT_TITLE_SCORE, "10.1000/1"), (CONFIDENT_TITLE_SCORE - 0.001, "10.1000/2")],
+)
+def test_pick_best_crossref_item_stops_at_confident_first_author_match(
+    monkeypatch, first_title_score: float, expected_doi: str
+) -> None:
+    monkeypatch.setattr(
+        paper_lookup, "_batch_title_similarity", lambda *args: [first_title_score, 0.99]
+    )
+    items = [
+        {"title": ["CRISPR screen in T cells"], "author": [{"family": "Miller"}], "DOI": "10.1000/1"},
+        {"title": ["CRISPR screens in T cells"], "author": [{"family": "Miller"}], "DOI": "10.1000/2"},
+    ]
+
+    best_item, _ = pick_best_crossref_item(items, "CRISPR screening in T cells", "Miller")
+
+    assert best_item is not None
+    assert best_item.get("DOI") == expected_doi
+
+
+@pytest.mark.parametrize(
+    ("first_title_score", "expected_pmid"),
+    [(CONFIDENT_TITLE_SCORE, "1"), (CONFIDENT_TITLE_SCORE - 0.001, "2")],
+)
+def test_pick_best_europe_pmc_result_stops_at_confident_first_author_match(
+    monkeypatch, first_title_score: float, expected_pmid: str
+) -> None:
+    monkeypatch.setattr(
+        paper_lookup, "_batch_title_similarity", lambda *args: [first_title_score, 0.99]
+    )
+    results = [
+        {"title": "CRISPR screen in T cells", "firstAuthor": "Miller A", "pmid": "1"},
+        {"title": "CRISPR screens in T cells", "firstAuthor": "Miller A", "pmid": "2"},
+    ]
+
+    best_result, _ = pick_best_europe_pmc_result(results, "CRISPR screening in T cells", "Miller")
+
+    assert best_result is not None
+    assert best_result.get("pmid") == expected_pmid
+
+
+def test_pick_best_europe_pmc_result_exact_title_skips_fuzzy_scoring(monkeypatch) -> None:
+    def fail(*args, **kwargs):
+        raise AssertionError("fuzzy scoring should not run for an exact title match")
+
+    monkeypatch.setattr(paper_lookup, "_batch_title_similarity", fail)
+    results = [
+        {"title": "CRISPR screens in T cells", "firstAuthor": "Jones A", "pmid": "1"},
+        {"title": "CRISPR Screens in T-Cells.", "firstAuthor": "Miller B", "pmid": "2"},
+    ]
+
+    best_result, score = pick_best_europe_pmc_result(results, "CRISPR screens in T cells", "Miller")
+
+    assert best_result is not None
+    assert best_result.get("pmid") == "2"
+    assert score == 1.3
+
+
+def test_pick_best_crossref_item_returns_none_for_empty_items() -> None:
+    assert pick_best_crossref_item([], "Editing CAR-T cells", "Miller") == (None, 0.0)
+
+
 def test_extract_crossref_pdf_links_filters_non_pdf_links() -> None:
     item = {
         "link": [
@@ -71,5 +195,129 @@ def test_dedupe_urls_keeps_only_http_and_https() -> None:
         "http://example.org/b.pdf",
         "ftp://example.org/not-allowed.pdf",
         "javascript:alert(1)",
+        "https://",
+        "HTTPS://Example.org/c.pdf",
+        "https://Example.org/c.pdf",
     ]
-    assert dedupe_urls(urls) == ["https://example.org/a.pdf", "http://example.org/b.pdf"]
+    assert dedupe_urls(urls) == [
+        "https://example.org/a.pdf",
+        "http://example.org/b.pdf",
+        "https://Example.org/c.pdf",
+    ]
+
+
+CROSSREF_PAYLOAD = {
+    "message": {
+        "items": [
+            {
+                "title": ["Editing CAR-T cells with CRISPR-Cas9"],
+                "author": [{"given": "Ada", "family": "Miller"}],
+                "DOI": "10.1000/match",
+                "link": [
+                    {"URL": "https://example.org/crossref.pdf", "content-type": "application/pdf"}
+                ],
+            }
+        ]
+    }
+}
+
+
+def _crossref_only_handler(calls: list[str]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        if str(request.url).startswith(CROSSREF_WORKS_URL):
+            return httpx.Response(200, json=CROSSREF_PAYLOAD)
+        return httpx.Response(503)
+
+    return handler
+
+
+def _run_discover(handler, title: str, last_name: str) -> dict:
+    async def run() -> dict:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await discover_paper(client, title, last_name)
+
+    return asyncio.run(run())
+
+
+def test_discover_paper_merges_provider_results(monkeypatch) -> None:
+    monkeypatch.delenv("UNPAYWALL_EMAIL", raising=False)
+    paper_lookup._LOOKUP_CACHE.clear()
+
+    result = _run_discover(
+        _crossref_only_handler([]), "Editing CAR-T cells with CRISPR Cas9", "Miller"
+    )
+
+    assert result["match"]["doi"] == "10.1000/match"
+    assert result["europe_pmc_match"] is None
+    assert result["candidate_urls"] == ["https://example.org/crossref.pdf"]
+    assert result["warnings"]
+
+
+def test_discover_paper_serves_repeat_lookups_from_cache(monkeypatch) -> None:
+    monkeypatch.delenv("UNPAYWALL_EMAIL", raising=False)
+    paper_lookup._LOOKUP_CACHE.clear()
+    calls: list[str] = []
+    handler = _crossref_only_handler(calls)
+
+    first = _run_discover(handler, "Editing CAR-T cells with CRISPR Cas9", "Miller")
+    upstream_calls = len(calls)
+    first["candidate_urls"].clear()
+    second = _run_discover(handler, "editing CAR-T cells, with CRISPR-Cas9", " MILLER ")
+
+    assert len(calls) == upstream_calls
+    assert second["match"]["doi"] == "10.1000/match"
+    assert second["candidate_urls"] == ["https://example.org/crossref.pdf"]
+
+
+def test_discover_paper_starts_unpaywall_before_crossref_finishes(monkeypatch) -> None:
+    monkeypatch.setenv("UNPAYWALL_EMAIL", "tester@example.org")
+    paper_lookup._LOOKUP_CACHE.clear()
+
+    async def run() -> dict:
+        unpaywall_requested = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            url = str(request.url)
+            if url.startswith(CROSSREF_WORKS_URL):
+                # Crossref only answers once Unpaywall has already been queried.
+                await asyncio.wait_for(unpaywall_requested.wait(), timeout=2.0)
+                return httpx.Response(200, json=CROSSREF_PAYLOAD)
+            if url.startswith(EUROPE_PMC_SEARCH_URL):
+                result = {
+                    "title": "Editing CAR-T cells with CRISPR-Cas9",
+                    "firstAuthor": "Miller A",
+                    "doi": "10.1000/pmc",
+                }
+                return httpx.Response(200, json={"resultList": {"result": [result]}})
+            unpaywall_requested.set()
+            return httpx.Response(
+                200, json={"best_oa_location": {"url_for_pdf": "https://example.org/oa.pdf"}}
+            )
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await discover_paper(client, "Editing CAR-T cells with CRISPR Cas9", "Miller")
+
+    result = asyncio.run(run())
+
+    assert result["crossref_match"] is not None
+    assert result["europe_pmc_match"]["doi"] == "10.1000/pmc"
+    assert "https://example.org/oa.pdf" in result["candidate_urls"]
+
+
+def test_discover_paper_keeps_provider_match_when_unpaywall_fails(monkeypatch) -> None:
+    monkeypatch.setenv("UNPAYWALL_EMAIL", "tester@example.org")
+    paper_lookup._LOOKUP_CACHE.clear()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        if url.startswith(CROSSREF_WORKS_URL):
+            return httpx.Response(200, json=CROSSREF_PAYLOAD)
+        if url.startswith(EUROPE_PMC_SEARCH_URL):
+            return httpx.Response(503)
+        return httpx.Response(200, content=b"<html>not json</html>")
+
+    result = _run_discover(handler, "Editing CAR-T cells with CRISPR Cas9", "Miller")
+
+    assert result["match"]["doi"] == "10.1000/match"
+    assert result["candidate_urls"] == ["https://example.org/crossref.pdf"]